@@ -13,18 +13,24 @@
    # limitations under the License.
 
 import opt.optAlg
+from opt._fast import improvement, burden_l1
 import numpy as np
-import operator
+
+# The optimization library keeps no device specific state, so all batteries share a single instance
+_opt = opt.optAlg.OptAlg()
 
 class Battery():
 	def __init__(self):
-		self.profile = []	# x_m in the PS paper
-		self.candidate = []	# ^x_m in the PS paper
+		self.profile = np.zeros(0)	# x_m in the PS paper
+		self.candidate = np.zeros(0)	# ^x_m in the PS paper
 		self.type = "BT"
 		self.burden = 0						# total bore burden / discomfort of this device
 		self.candidate_improvement = 0		# last proposed improvement
 		self.candidate_burden = 0			# last proposed burden their candidate would inflict
-		self.initial_profile = []			# saved initial profile, to be saved for reruns
+		self.initial_profile = np.zeros(0)	# saved initial profile, to be saved for reruns
+		self.T = 0							# number of intervals in the planning, set by init()
+		self._p_m = np.zeros(0)				# scratch buffer for p_m
+		self._zero_demand = []				# zero demand (static losses) handed to the planner
 		
 		# Device specific params
 		self.capacity = 	14000	# Wtau -> so divide over 4 for Wh
@@ -32,44 +38,48 @@ class Battery():
 		self.min_power = 	-5000	# W
 		self.initialSoC = 	0.5*self.capacity
 		
-		# Importing the optimization library
-		self.opt = opt.optAlg.OptAlg()
+		# Importing the optimization library (shared instance)
+		self.opt = _opt
 	
 	def init(self, p):
+		self.T = len(p)	# number of intervals, cached for the planning requests
+		self._p_m = np.empty(self.T)	# scratch buffer for p_m, reused by every planning request
+		
 		# Create an initial planning. 
 		# Since we do not know what the rest of the appliances do, we can just fill it with zeroes:
-		self.profile = [0]*len(p) 
+		self.profile = np.zeros(self.T)
 		self.initial_profile = self.profile		
+		self._zero_demand = [0] * self.T	# static losses are not used, the planner only reads this list so it can be reused every plan
 
-		return list(self.profile)
+		return self.profile.copy()	# as an array, a copy so the caller cannot change our profile
 			
 	def plan(self, d): 
 		# desired is "d" in the PS paper
-		p_m = list(map(operator.sub, self.profile, d)) # p_m = x_m - d
+		p_m = np.subtract(self.profile, d, out=self._p_m) # p_m = x_m - d, written into the scratch buffer
 	
 		# Call the magic
 		# Function prototype: 
 		# bufferPlanning(	self, desired, targetSoC, initialSoC, capacity, demand, chargingPowers, powerMin = 0, powerMax = 0,
 		#					powerLimitsLower = [], powerLimitsUpper = [], reactivePower = False, prices = [], profileWeight = 1)
 	
-		self.candidate = self.opt.bufferPlanning(	p_m,
+		self.candidate = np.array(self.opt.bufferPlanning(	p_m.tolist(),
 													self.initialSoC, 
 													self.initialSoC,
 													self.capacity,
-													[0] * len(p_m), # Static losses, not used
+													self._zero_demand, # Static losses, not used
 													[], self.min_power, self.max_power,
 													[], [],
 													False,
 													[],
-													1 )
+													1 ))
 													# We set the target equal to the initial SoC. Note that more clever options based on the desired profile are possible!!!
 													
 		# Calculate the improvement by this device:
-		self.candidate_improvement = np.linalg.norm(np.array(self.profile)-np.array(p_m)) - np.linalg.norm(np.array(self.candidate)-np.array(p_m))
+		self.candidate_improvement = improvement(self.profile, self.candidate, p_m)
 
 		# Calculate the additional burden / discomfort this change would inflict on this device:
 		normalizer = self.capacity 	# 1=a full capacity
-		self.candidate_burden = np.linalg.norm(np.array(self.candidate)-np.array(self.initial_profile), ord=1) / normalizer	# deviation from initial profile, normalized
+		self.candidate_burden = burden_l1(self.candidate, self.initial_profile) / normalizer	# deviation from initial profile, normalized
 		
 		# Return the improvement and additional burden
 		# print("Improvement: ", self, e_m)
@@ -78,9 +88,9 @@ class Battery():
 		
 	def accept(self):
 		# We are chosen as winner, replace the profile:
-		diff = list(map(operator.sub, self.candidate, self.profile))
-		self.profile = list(self.candidate)
+		diff = self.candidate - self.profile
+		self.profile = self.candidate.copy()
 		self.burden = self.candidate_burden			# update bore burden / discomfort 
 		
 		# Note we can send the difference profile only as incremental update
-		return diff
\ No newline at end of file
+		return diff	# as an array, ProfileSteering adds it to the aggregate profile directly
\ No newline at end of file
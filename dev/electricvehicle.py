@@ -13,19 +13,24 @@
    # limitations under the License.
 
 import opt.optAlg
+from opt._fast import improvement, burden_l1
 import numpy as np
-import operator
 import random
 
+# The optimization library keeps no device specific state, so all EVs share a single instance
+_opt = opt.optAlg.OptAlg()
+
 class ElectricVehicle():
 	def __init__(self, seed):
-		self.profile = []	# x_m in the PS paper
-		self.candidate = []	# ^x_m in the PS paper
+		self.profile = np.zeros(0)	# x_m in the PS paper
+		self.candidate = np.zeros(0)	# ^x_m in the PS paper
 		self.type = "EV"
 		self.burden = 0						# total bore burden / discomfort of this device
 		self.candidate_improvement = 0		# last proposed improvement
 		self.candidate_burden = 0			# last proposed burden their candidate would inflict
-		self.initial_profile = []			# saved initial profile, to be saved for reruns
+		self.initial_profile = np.zeros(0)	# saved initial profile, to be saved for reruns
+		self.T = 0							# number of intervals in the planning, set by init()
+		self._p_m = np.zeros(0)				# scratch buffer for p_m
 		random.seed(seed)					# set seed for random connection+departing times & charge request
 		
 		# Intervallength in seonds
@@ -45,6 +50,9 @@ class ElectricVehicle():
 		# using intervals of 15 mintues for one day, e.g. 96 in total
 		self.startTime = random.randint(7*4, 12*4)	# Random connection time (15 minute intervals used here)
 		self.endTime = random.randint(15*4, 22*4)	# Random departure time (15 minute intervals used here)
+		self._window = slice(self.startTime, self.endTime)	# Intervals at which the EV is connected
+		self._window_len = self.endTime - self.startTime	# Number of intervals at which the EV is connected
+		self._zero_demand_window = [0] * self._window_len	# zero demand (static losses) over the connection window, only read by the planner
 		
 		# Energy demand by the EV
 		self.chargeRequest = random.randint(4000, 22000) # Wh
@@ -52,14 +60,17 @@ class ElectricVehicle():
 		assert(self.initialSoC >= 0)
 		# Note: Ensure that the EV can be charged in time! (time in hours * maximum charge power!)
 		
-		# Importing the optimization library
-		self.opt = opt.optAlg.OptAlg()
+		# Importing the optimization library (shared instance)
+		self.opt = _opt
 	
 	def init(self, p):
+		self.T = len(p)	# number of intervals, cached for the planning requests
+		self._p_m = np.empty(self.T)	# scratch buffer for p_m, reused by every planning request
+		
 		# Create an initial planning. 
 		# Need to set the initial profile to get the correct length:
-		self.profile = [0] * len(p)
-		self.initial_profile = [0] * len(p)	
+		self.profile = np.zeros(self.T)
+		self.initial_profile = np.zeros(self.T)
 		
 		# We can use the planning function in a local fashion with a zero profile to get a plan
 		# Another option would be to use a greedy strategy to plan the profile with greedy charging: asap
@@ -68,12 +79,12 @@ class ElectricVehicle():
 
 		self.initial_profile = self.profile	
 		
-		return list(self.profile)
+		return self.profile.copy()	# as an array, a copy so the caller cannot change our profile
 	
 	# Receiving a plan request from the Profile Steering algorithm
 	def plan(self, d): 
 		# desired is "d" in the PS paper
-		p_m = list(map(operator.sub, self.profile, d)) # p_m = x_m - d
+		p_m = np.subtract(self.profile, d, out=self._p_m) # p_m = x_m - d, written into the scratch buffer
 	
 		# Call the magic
 		
@@ -83,11 +94,11 @@ class ElectricVehicle():
 			# bufferPlanning(	self, desired, targetSoC, initialSoC, capacity, demand, chargingPowers, powerMin = 0, powerMax = 0,
 			#					powerLimitsLower = [], powerLimitsUpper = [], reactivePower = False, prices = [], profileWeight = 1)
 	
-			profile = self.opt.bufferPlanning(	p_m[self.startTime:self.endTime],
+			profile = self.opt.bufferPlanning(	p_m[self._window].tolist(),
 												self.capacity, 
 												self.initialSoC,
 												self.capacity,
-												[0] * len(p_m[self.startTime:self.endTime]), # Static losses, not used
+												self._zero_demand_window, # Static losses, not used
 												[], self.powers[0], self.powers[1],
 												[], [],
 												False,
@@ -99,24 +110,23 @@ class ElectricVehicle():
 		else:
 			# Function prototype: 
 			# discreteBufferPlanningPositive(self, desired, chargeRequired, chargingPowers, powerLimitsUpper = [], prices = None, beta = 1):	
-			profile = self.opt.discreteBufferPlanningPositive(	p_m[self.startTime:self.endTime],						# We only need the section at which the EV is connected
+			profile = self.opt.discreteBufferPlanningPositive(	p_m[self._window].tolist(),						# We only need the section at which the EV is connected
 														self.chargeRequest * int(3600/self.intervalLength), 			# We need to convert this in "wattTau" instead of WattHours.
 														self.powers,
 														[],
 														None,
 														1 )
 															
-		self.candidate = [0] * len(p_m)	# Create an empty vector		
+		self.candidate = np.zeros(self.T)	# Create an empty vector		
 		# Now add the optimized profile at the right indices of the vector
-		for i in range(self.startTime, self.endTime):
-			self.candidate[i] = profile[i-self.startTime]
+		self.candidate[self._window] = profile
 													
 		# Calculate the improvement by this device:
-		self.candidate_improvement = np.linalg.norm(np.array(self.profile)-np.array(p_m)) - np.linalg.norm(np.array(self.candidate)-np.array(p_m))
+		self.candidate_improvement = improvement(self.profile, self.candidate, p_m)
 		
 		# Calculate the additional burden / discomfort this change would inflict on this device:
 		normalizer = self.chargeRequest * 2 * 4	# 1=a full capacity moved away, will result in 1-norm deviation of twice the charge, by 4 to convert from Wh to Wtau
-		self.candidate_burden = np.linalg.norm(np.array(self.candidate)-np.array(self.initial_profile), ord=1) / normalizer	# deviation from initial profile, normalized
+		self.candidate_burden = burden_l1(self.candidate, self.initial_profile) / normalizer	# deviation from initial profile, normalized
 		
 		# Return the improvement and additional burden
 		# print("Improvement: ", self, e_m)
@@ -126,9 +136,9 @@ class ElectricVehicle():
 	# Accept a profile	
 	def accept(self):
 		# We are chosen as winner, replace the profile:
-		diff = list(map(operator.sub, self.candidate, self.profile))
-		self.profile = list(self.candidate)
+		diff = self.candidate - self.profile
+		self.profile = self.candidate.copy()
 		self.burden = self.candidate_burden			# update bore burden / discomfort 
 		
 		# Note we can send the difference profile only as incremental update
-		return diff
\ No newline at end of file
+		return diff	# as an array, ProfileSteering adds it to the aggregate profile directly
\ No newline at end of file
@@ -13,19 +13,24 @@
    # limitations under the License.
 
 import opt.optAlg
+from opt._fast import improvement, burden_l1
 import numpy as np
-import operator
 import random
 
+# The optimization library keeps no device specific state, so all heatpumps share a single instance
+_opt = opt.optAlg.OptAlg()
+
 class HeatPump():
 	def __init__(self, seed):
-		self.profile = []	# x_m in the PS paper
-		self.candidate = []	# ^x_m in the PS paper
+		self.profile = np.zeros(0)	# x_m in the PS paper
+		self.candidate = np.zeros(0)	# ^x_m in the PS paper
 		self.type = "HP"
 		self.burden = 0						# total bore burden / discomfort of this device
 		self.candidate_improvement = 0		# last proposed improvement
 		self.candidate_burden = 0			# last proposed burden their candidate would inflict
-		self.initial_profile = []			# saved initial profile, to be saved for reruns
+		self.initial_profile = np.zeros(0)	# saved initial profile, to be saved for reruns
+		self.T = 0							# number of intervals in the planning, set by init()
+		self._p_m = np.zeros(0)				# scratch buffer for p_m
 		random.seed(seed)					# set seed for random heat demand 
 		
 		# Device specific params
@@ -35,20 +40,22 @@ class HeatPump():
 		self.initialSoC = 	0.5*self.capacity
 			
 		
-		# Importing the optimization library
-		self.opt = opt.optAlg.OptAlg()
+		# Importing the optimization library (shared instance)
+		self.opt = _opt
 	
 	def init(self, p):
+		self.T = len(p)	# number of intervals, cached for the planning requests
+		self._p_m = np.empty(self.T)	# scratch buffer for p_m, reused by every planning request
+		
 		# Heat demand  
 		# We create a random list of power values, but it can be any list
-		self.heatdemand =  []
-		for i in range(0, len(p)):
-			self.heatdemand.append(self.max_power*1.5*random.random())
+		# Drawn from the global generator, as originally: these values define the scenario the results in main.py were obtained with
+		self.heatdemand = [self.max_power*1.5*random.random() for i in range(0, self.T)]	# kept as list, the planner loops over it
 	
 		# Create an initial planning. 
 		# Need to set the initial profile to get the correct length:
-		self.profile = [0] * len(p)	
-		self.initial_profile = [0] * len(p)	
+		self.profile = np.zeros(self.T)
+		self.initial_profile = np.zeros(self.T)
 		
 		# We can use the planning function in a local fashion with a zero profile to get a plan
 		# Another option would be to use a greedy strategy to plan the profile with greedy charging: asap
@@ -57,18 +64,18 @@ class HeatPump():
 
 		self.initial_profile = self.profile	
 		
-		return list(self.profile)
+		return self.profile.copy()	# as an array, a copy so the caller cannot change our profile
 			
 	def plan(self, d): 
 		# desired is "d" in the PS paper
-		p_m = list(map(operator.sub, self.profile, d)) # p_m = x_m - d
+		p_m = np.subtract(self.profile, d, out=self._p_m) # p_m = x_m - d, written into the scratch buffer
 	
 		# Call the magic
 		# Function prototype: 
 		# bufferPlanning(	self, desired, targetSoC, initialSoC, capacity, demand, chargingPowers, powerMin = 0, powerMax = 0,
 		#					powerLimitsLower = [], powerLimitsUpper = [], reactivePower = False, prices = [], profileWeight = 1)
 	
-		self.candidate = self.opt.bufferPlanning(	p_m,
+		self.candidate = np.array(self.opt.bufferPlanning(	p_m.tolist(),
 													self.initialSoC, 
 													self.initialSoC,
 													self.capacity,
@@ -77,15 +84,15 @@ class HeatPump():
 													[], [],
 													False,
 													[],
-													1 )
+													1 ))
 													# We set the target equal to the initial SoC. Note that more clever options based on the desired profile are possible!!!
 				
 		# Calculate the improvement by this device:
-		self.candidate_improvement = np.linalg.norm(np.array(self.profile)-np.array(p_m)) - np.linalg.norm(np.array(self.candidate)-np.array(p_m))
+		self.candidate_improvement = improvement(self.profile, self.candidate, p_m)
 		
 		# Calculate the additional burden / discomfort this change would inflict on this device:
 		normalizer = self.capacity 	# 1=a full capacity
-		self.candidate_burden = np.linalg.norm(np.array(self.candidate)-np.array(self.initial_profile), ord=1) / normalizer	# deviation from initial profile, normalized
+		self.candidate_burden = burden_l1(self.candidate, self.initial_profile) / normalizer	# deviation from initial profile, normalized
 
 		# Return the improvement and additional burden	
 		# print("Improvement: ", self, e_m)
@@ -94,9 +101,9 @@ class HeatPump():
 		
 	def accept(self):
 		# We are chosen as winner, replace the profile:
-		diff = list(map(operator.sub, self.candidate, self.profile))
-		self.profile = list(self.candidate)
+		diff = self.candidate - self.profile
+		self.profile = self.candidate.copy()
 		self.burden = self.candidate_burden			# update bore burden / discomfort 
 		
 		# Note we can send the difference profile only as incremental update
-		return diff
\ No newline at end of file
+		return diff	# as an array, ProfileSteering adds it to the aggregate profile directly
\ No newline at end of file
@@ -13,59 +13,51 @@
    # limitations under the License.
 
 import random
-import operator 
 import numpy as np
 
 class Load():
 	def __init__(self, seed):
-		self.profile = []	# x_m in the PS paper
-		self.candidate = []	# ^x_m in the PS paper
+		self.profile = np.zeros(0)	# x_m in the PS paper
+		self.candidate = np.zeros(0)	# ^x_m in the PS paper
 		self.type = "BL"
 		self.burden = 0						# total bore burden / discomfort of this device
 		self.candidate_improvement = 0		# last proposed improvement
 		self.candidate_burden = 0			# last proposed burden their candidate would inflict
-		self.initial_profile = []			# saved initial profile, to be saved for reruns
+		self.initial_profile = np.zeros(0)	# saved initial profile, to be saved for reruns
+		self.T = 0							# number of intervals in the planning, set by init()
 		self.seed = seed					# set seed for random profile generator
 		
 		# Device specific params
 		self.max = 5000	# W
 	
 	def init(self, p):
-		# Create a baseload for a given number of intervals
-		self.profile = [] # Empty the profile
+		self.T = len(p)	# number of intervals, cached for the planning requests
 		
+		# Create a baseload for a given number of intervals
 		# We create a random list of power values, but it can be any list
-		for i in range(0, len(p)):
-			random.seed(self.seed+i)		# set seed, different for each profile value					
-			self.profile.append(self.max*random.random())
+		# These values define the scenario the results in main.py were obtained with, so keep the original seeding, only store into an array
+		self.profile = np.empty(self.T)
+		for i in range(0, self.T):
+			random.seed(self.seed+i)		# set seed, different for each profile value
+			self.profile[i] = self.max*random.random()
 			
 		self.initial_profile = self.profile	
 			
-		return list(self.profile)
+		return self.profile.copy()	# as an array, a copy so the caller cannot change our profile
 			
 	def plan(self, d):
-		assert(len(d) == len(self.profile))
-		p_m = list(map(operator.sub, self.profile, d)) # p_m = x_m - d
-		
-		self.candidate = list(self.profile)	# A baseload offers no flex, so we can just return the profile
-											# Note that we need to create a new list due to "hidden pointers" in Python
-											
-		# Calculate the improvement by this device:
-		self.candidate_improvement = np.linalg.norm(np.array(self.profile)-np.array(p_m)) - np.linalg.norm(np.array(self.candidate)-np.array(p_m))
-		
-		# Calculate the additional burden / discomfort this change would inflict on this device:
-		self.candidate_burden = np.linalg.norm(np.array(self.candidate)-np.array(self.initial_profile), ord=1) 	# deviation from initial profile, will be 0
+		# A baseload is a static device: it offers no flex, so its candidate is its current profile
+		# Hence both the improvement and the additional burden are exactly 0, no need to calculate them
+		self.candidate = self.profile
+		self.candidate_improvement = 0.0
+		self.candidate_burden = 0.0
 		
 		# Return the improvement and additional burden
-		# Note that e_m should be 0 for a static device
-		# print("Improvement: ", self, e_m)
-		return self.candidate_improvement, self.candidate_burden
+		return 0.0, 0.0
 		
 	def accept(self):
-		# We are chosen as winner, replace the profile:
-		diff = list(map(operator.sub, self.candidate, self.profile))
-		self.profile = list(self.candidate)
+		# We are chosen as winner, but the profile of a static device does not change
 		self.burden = self.candidate_burden			# update bore burden / discomfort 
 		
 		# Note we can send the difference profile only as incremental update
-		return diff		# return 0 difference as baseload does not change anything when picked 
\ No newline at end of file
+		return np.zeros(self.T)	# return 0 difference as baseload does not change anything when picked
\ No newline at end of file
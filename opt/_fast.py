@@ -0,0 +1,142 @@
+   # Copyright 2023 University of Twente
+
+   # Licensed under the Apache License, Version 2.0 (the "License");
+   # you may not use this file except in compliance with the License.
+   # You may obtain a copy of the License at
+
+       # http://www.apache.org/licenses/LICENSE-2.0
+
+   # Unless required by applicable law or agreed to in writing, software
+   # distributed under the License is distributed on an "AS IS" BASIS,
+   # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   # See the License for the specific language governing permissions and
+   # limitations under the License.
+
+# Small numeric kernels used in the plan() step of every device and in the selection step of ProfileSteering.
+# These run once per device or once per iteration, so they are compiled with Numba when it is available.
+# The compiled kernels release the GIL, such that devices can be planned in parallel threads.
+# Without Numba the same calculations are done with plain numpy.
+
+import math
+import numpy as np
+
+try:
+	from numba import njit
+except ImportError:
+	njit = None
+
+
+if njit is not None:
+	@njit(cache=True, fastmath=True, nogil=True)
+	def improvement(profile, candidate, p_m):
+		# ||x_m - p_m||_2 - ||^x_m - p_m||_2 in a single pass without temporary arrays
+		s1 = 0.0
+		s2 = 0.0
+		for i in range(profile.shape[0]):
+			a = profile[i] - p_m[i]
+			b = candidate[i] - p_m[i]
+			s1 += a*a
+			s2 += b*b
+		return math.sqrt(s1) - math.sqrt(s2)
+
+	@njit(cache=True, fastmath=True, nogil=True)
+	def burden_l1(candidate, initial):
+		# ||^x_m - x_m(initial)||_1, the (unnormalized) deviation from the initial profile
+		s = 0.0
+		for i in range(candidate.shape[0]):
+			s += abs(candidate[i] - initial[i])
+		return s
+
+	@njit(cache=True, fastmath=True, nogil=True)
+	def apply_diff(x, d, diff):
+		# x += diff and d += diff in one pass, returns the change of ||d||_2^2: 2 d.diff + ||diff||_2^2 (d before the update)
+		delta = 0.0
+		for i in range(diff.shape[0]):
+			delta += (2*d[i] + diff[i]) * diff[i]
+			x[i] += diff[i]
+			d[i] += diff[i]
+		return delta
+
+	@njit(cache=True, nogil=True, error_model='numpy')	# no fastmath: a normalization by 0 gives nan scores, which must never win
+	def fairer_pick(candidate_burden, candidate_improvement, order, tau):
+		# Index of the contributing device with the lowest score tau*B_m/mean(B) - (1-tau)*E_m/mean(E)
+		# order holds the contributing devices (E_m > 0) in the order they are visited, ties go to the first one visited
+		# Kept serial: for the ~75 devices a parallel loop costs more in thread startup than it saves, and the ties depend on the visiting order
+		M = order.shape[0]
+		sum_B = 0.0
+		sum_E = 0.0
+		for k in range(M):
+			sum_B += candidate_burden[order[k]]
+			sum_E += candidate_improvement[order[k]]
+		best = -1
+		lowest_score = np.inf
+		for k in range(M):
+			j = order[k]
+			score = tau*(candidate_burden[j] / ((1/M)*sum_B)) - (1-tau)*(candidate_improvement[j] / ((1/M)*sum_E))
+			if score < lowest_score:
+				lowest_score = score
+				best = j
+		return best
+
+	@njit(cache=True, fastmath=True, nogil=True)
+	def gini(values, ranks):
+		# Gini coefficient from the sorted values: (2 sum_i i*x(i) - (n+1) sum_i x(i)) / (n sum_i x(i)), ranks holds 1..n
+		n = values.shape[0]
+		sorted_values = np.sort(values)
+		total = 0.0
+		weighted = 0.0
+		for i in range(n):
+			total += sorted_values[i]
+			weighted += ranks[i] * sorted_values[i]
+		if total == 0:
+			return 0.0
+		return (2 * weighted - (n+1) * total) / (n * total)
+
+else:
+	def improvement(profile, candidate, p_m):
+		# ||x_m - p_m||_2 - ||^x_m - p_m||_2
+		a = profile - p_m
+		b = candidate - p_m
+		return math.sqrt(a.dot(a)) - math.sqrt(b.dot(b))
+
+	def burden_l1(candidate, initial):
+		# ||^x_m - x_m(initial)||_1, the (unnormalized) deviation from the initial profile
+		return np.abs(candidate - initial).sum()
+
+	def apply_diff(x, d, diff):
+		# x += diff and d += diff, returns the change of ||d||_2^2: 2 d.diff + ||diff||_2^2 (d before the update)
+		delta = 2*d.dot(diff) + diff.dot(diff)
+		x += diff
+		d += diff
+		return delta
+
+	def fairer_pick(candidate_burden, candidate_improvement, order, tau):
+		# Index of the contributing device with the lowest score tau*B_m/mean(B) - (1-tau)*E_m/mean(E)
+		# order holds the contributing devices (E_m > 0) in the order they are visited, ties go to the first one visited
+		M = order.size
+		if M == 0:
+			return -1
+		B = candidate_burden[order]
+		E = candidate_improvement[order]
+		with np.errstate(divide='ignore', invalid='ignore'):
+			scores = tau*(B / ((1/M)*B.sum())) - (1-tau)*(E / ((1/M)*E.sum()))
+		scores[np.isnan(scores)] = np.inf	# nan scores never win
+		k = np.argmin(scores)
+		return int(order[k]) if scores[k] < np.inf else -1
+
+	def gini(values, ranks):
+		# Gini coefficient from the sorted values: (2 sum_i i*x(i) - (n+1) sum_i x(i)) / (n sum_i x(i)), ranks holds 1..n
+		n = values.size
+		sorted_values = np.sort(values)
+		total = sorted_values.sum()
+		if total == 0:
+			return 0.0
+		return (2 * np.dot(ranks, sorted_values) - (n+1) * total) / (n * total)
+
+
+# Warm up: trigger the compilation (or load it from the cache) at import instead of in the first iteration
+improvement(np.zeros(1), np.zeros(1), np.zeros(1))
+burden_l1(np.zeros(1), np.zeros(1))
+apply_diff(np.zeros(1), np.zeros(1), np.zeros(1))
+fairer_pick(np.ones(1), np.ones(1), np.zeros(1, dtype=np.int64), 0.5)
+gini(np.ones(1), np.ones(1))
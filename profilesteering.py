@@ -12,111 +12,180 @@
    # See the License for the specific language governing permissions and
    # limitations under the License.
    
-import operator
 import numpy as np
-import random
+from opt import _fast
+from concurrent.futures import ThreadPoolExecutor
 
 class ProfileSteering():
-	def __init__(self, devices):
+	def __init__(self, devices, workers=1, seed=None):
 		self.devices = devices
-		self.p = [] # p in the PS paper
-		self.x = [] # x in the PS paper
+		self.workers = workers	# number of threads used to request plannings from the devices, 1 = sequential
+		self.rng = np.random.default_rng(seed)	# generator for the random tie-breaking, reseeded by rerun()
+		self.p = np.zeros(0) # p in the PS paper
+		self.x = np.zeros(0) # x in the PS paper
+		
+		# Baseloads are static, they never propose a change. Keep them apart so the iterative phase only asks the controllable devices
+		self.baseloads = [device for device in devices if device.type == "BL"]
+		self.controllable = [device for device in devices if device.type != "BL"]
+		self.gini_ranks = np.arange(1.0, len(self.controllable)+1)	# the number of controllable devices is fixed, so are the ranks used by the Gini coefficient
+		# State of the controllable devices as arrays, slot j belongs to self.controllable[j], such that the selection works on whole arrays
+		self.burdens = np.zeros(len(self.controllable))	# burden of each controllable device, only the slot of the winner changes per iteration
+		self.candidate_burdens = np.zeros(len(self.controllable))		# proposed burden of each controllable device, refilled every iteration
+		self.candidate_improvements = np.zeros(len(self.controllable))	# proposed improvement of each controllable device, refilled every iteration
+		self.base_matrix = np.zeros((0, 0))	# baseload profiles stacked as (nr_baseloads, intervals)
+		self.base_profile = np.zeros(0)		# static contribution of all baseloads together
+		self.initial_x = np.zeros(0)		# aggregate profile after the initial planning
+		self.initial_state = []				# (profile, candidate) of every device after the initial planning
 	
 	def init(self, p):
 		# Set the desired profile and reset xrange
-		self.p = list(p)
-		self.x = [0] * len(p)
+		self.p = np.asarray(p, dtype=np.float64)	# kept as array, the iterations only do vector math with it
+	
+		# Collect the baseloads in one matrix, their sum is the static part of the aggregate profile
+		self.base_matrix = np.zeros((len(self.baseloads), len(p)))
+		for i, device in enumerate(self.baseloads):
+			self.base_matrix[i] = device.init(p)
+		self.base_profile = self.base_matrix.sum(axis=0)
+		self.x = self.base_profile.copy()
 	
-		# Ask all devices to propose an initial planning
-		for device in self.devices:
+		# Ask all controllable devices to propose an initial planning
+		for device in self.controllable:
 			r = device.init(p) 	# request device to create a planning
-			self.x = list(map(operator.add, self.x, r))	# Perform the summation by adding the overall profile to the planning
+			self.x += r	# Perform the summation by adding the planning to the overall profile, in place
+		
+		# Snapshot the initial planning, such that reruns (e.g. for another tau) restore it instead of planning all devices again
+		# Devices replace their profile arrays rather than changing them in place, so keeping the references is enough
+		self.initial_x = self.x.copy()
+		self.initial_state = [(device.profile, device.candidate) for device in self.devices]
 		
 		#print("Initial planning", self.x)
-		return self.x
+		return self.initial_x.copy()	# a copy, as self.x is updated in place by the iterations
 	
-	def rerun(self,x):
-		# ask all devices to return to initial planning
-		for device in self.devices:
-			device.profile = device.initial_profile
+	def rerun(self, x=None, seed=None):
+		# restart the random tie-breaking, such that a run with the same seed picks the same devices
+		if seed is not None:
+			self.rng = np.random.default_rng(seed)
+		
+		# ask all devices to return to the snapshot of their initial planning
+		for device, (profile, candidate) in zip(self.devices, self.initial_state):
+			device.profile = profile
+			device.candidate = candidate
+			device.candidate_improvement = 0
+			device.candidate_burden = 0
 			device.burden = 0	#reset their burden
-		self.x = x		# reset aggregate profile
+		np.copyto(self.x, self.initial_x if x is None else x)		# reset aggregate profile, in place as init() already allocated it
 		return 0
 	
-	def gini(values):												# function to return Gini coefficient of an array of values, based on A. Sen as half of the relative mean absolute difference
+	def plan_device(self, j, d):
+		# request a new candidate profile from controllable device j, its proposal is stored in slot j of the candidate arrays
+		self.candidate_improvements[j], self.candidate_burdens[j] = self.controllable[j].plan(d)
+	
+	def plan_devices(self, d, pool=None):
+		# request a new candidate profile from each controllable device
+		# Devices only read d and their own state, and each writes its own slot, so within an iteration they can plan independently of each other
+		# All devices get the same d array, they must not change it (iterative() hands a read-only view) nor keep it beyond the call
+		if pool is None:
+			for j in range(len(self.controllable)):
+				self.plan_device(j, d)
+		else:
+			list(pool.map(lambda j: self.plan_device(j, d), range(len(self.controllable))))	# wait for all devices
+	
+	def pick_vanilla(self, tau):
+		# Vanilla PS mechanism: the device with the largest improvement, the first one in case of ties. -1 if no device improves
+		if not self.controllable:
+			return -1
+		best = int(np.argmax(self.candidate_improvements))
+		return best if self.candidate_improvements[best] > 0 else -1
+	
+	def pick_fairer(self, tau):
+		# Fairer PS mechanism: the contributing device (e_m > 0) with the lowest score, normalized over the mean burden and improvement. -1 if no device improves
+		contributing_devices = np.flatnonzero(self.candidate_improvements > 0)
+		contributing_devices = self.rng.permutation(contributing_devices)		# shuffle device order, for fair picking in case of ties
+		return _fast.fairer_pick(self.candidate_burdens, self.candidate_improvements, contributing_devices, tau)
+	
+	def gini(values, ranks=None):									# function to return Gini coefficient of an array of values, based on A. Sen as half of the relative mean absolute difference
 		n = values.size												# number of values
 		if n == 0:
 			return 0												# return 0 if an empty array is handed
-		mean = values.mean()										# mean of all values
-		diff_sum = np.abs(values[:, None] - values).sum()			# double summation of |xi - xj| for all n x n combinations
-		denominator = 2 * n**2 * mean								# denominator for dividing the double summation over 2 and normalizing over calculations (n^2) and mean 
-		return diff_sum / denominator if denominator != 0 else 0	# return calculation, tackle divisions by 0
+		if ranks is None:
+			ranks = np.arange(1.0, n+1)								# ranks 1..n of the sorted values, can be handed in when n is fixed
+		# sum_i sum_j |xi - xj| / (2 n^2 mean) == (2 sum_i i*x(i) - (n+1) sum_i x(i)) / (n sum_i x(i)), with x(i) the i-th smallest value
+		return _fast.gini(values, ranks)							# compiled kernel, returns 0 for an all-zero array
+		
+	def iterative(self, e_min, max_iters, tau, rel_tol=0):
+		# Initialize trackers for each iteration, preallocated for max_iters and cut to the used length at the end
+		tr_improvement = np.empty(max_iters)
+		tr_objective = np.empty(max_iters)	# holds the squared objective during the loop, the square root is taken once at the end
+		tr_gini = np.empty(max_iters)
+		k = 0	# number of accepted plannings, i.e. entries in tr_improvement
+		n = 0	# number of iterations done, i.e. entries in tr_objective and tr_gini
 		
-	def iterative(self, e_min, max_iters, tau):
-		# Initialize trackers for each iteration
-		tr_improvement = np.array([])
-		tr_objective = np.array([])
-		tr_gini = np.array([])
+		# Optionally plan the devices in parallel. Only pays off when the planning releases the GIL (Numba kernels, free-threaded Python)
+		pool = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+		
+		tau_f = float(tau)	# tau's like 0 and 1 are ints, the compiled scoring kernel is only compiled (and cached) for a float tau
+		pick_winner = self.pick_vanilla if tau == -1 else self.pick_fairer	# decide on the mechanism once, not in every iteration
 
+		# Fill the burden buffer once, afterwards only the winner's slot is updated
+		for j, device in enumerate(self.controllable):
+			self.burdens[j] = device.burden
+		
+		# difference profile d = x - p and its squared 2-norm, both updated incrementally with the accepted changes
+		d = self.x - self.p
+		sq_objective = float(d @ d)
+		d_view = d.view()				# the devices get one shared read-only view of d, which follows the in place updates of d
+		d_view.flags.writeable = False	# devices must not change d, a mistake raises instead of corrupting the other devices' planning
+		
+		# Convergence detection: stop once the moving average of the improvements drops below rel_tol times the initial objective (rel_tol = 0: off)
+		min_avg_improvement = rel_tol * np.sqrt(sq_objective)
+		avg_improvement = None		# exponential moving average of the improvement, starts at the first improvement
+		
 		# Iterative Loop
 		for i in range(0, max_iters):	# Note we deviate here slightly by also defining a maximum number of iterations
 			# Init
 			best_improvement = 0
-			best_device = None
-			lowest_score = np.inf		# initialize score as infinity to ensure the first device is an improvement
+			best = -1		# slot of the best device, -1 if none
 			
-			# difference profile
-			d = list(map(operator.sub, self.x, self.p)) # d = x - p
+			# request a new candidate profile from each controllable device, filling the candidate arrays
+			self.plan_devices(d_view, pool)
 			
-			if (tau == -1):					# Vanilla PS mechanism:
-				#request a new candidate profile from each device
-				for device in self.devices:
-					improvement, add_burden = device.plan(d)	# add_burden added to the old code as .plan now returns a tuple
-					if improvement > best_improvement:
-						best_improvement = improvement
-						best_device = device
-
-			else: 	# Fairer PS mechanism:
-				# request a new candidate profile from each device
-				for device in self.devices:
-					improvement, add_burden = device.plan(d)
-				# filter out non-contributing devices (essentially exclude baseloads), 
-				contributing_devices = [cd for cd in self.devices if cd.candidate_improvement > 0]	
-				random.shuffle(contributing_devices)		# shuffle device order, for fair picking in case of ties
-				#calculate values required for normalization
-				sum_B = sum(cd.candidate_burden for cd in contributing_devices)		
-				sum_E = sum(cd.candidate_improvement for cd in contributing_devices)
-				M = len(contributing_devices)	
-				# score all devices that have e_m > 0 
-				for device in contributing_devices:
-					score_pt1 = device.candidate_burden / ((1/M)*sum_B)
-					score_pt2 = device.candidate_improvement / ((1/M)*sum_E)
-					score = tau*score_pt1-(1-tau)*score_pt2
-					# track lowest scoring device
-					if (score < lowest_score):
-							lowest_score = score			
-							best_device = device
-							best_improvement = best_device.candidate_improvement
+			# pick the winner with the mechanism bound before the loop
+			best = pick_winner(tau_f)
+			if best >= 0:
+				best_improvement = self.candidate_improvements[best]
 					
 			# Now set the winner (best scoring device) and update its planning+burden and improvement tracker
-			if best_device is not None:
-				diff = best_device.accept()
-				self.x = list(map(operator.add, self.x, diff))
-				tr_improvement = np.append(tr_improvement,best_improvement)
+			if best >= 0:
+				best_device = self.controllable[best]
+				diff = np.asarray(best_device.accept(), dtype=np.float64)	# devices return float64 arrays, this only converts a device that returns a list
+				self.burdens[best] = best_device.burden
+				# x += diff, and d = x - p stays in sync with x (and so does the read-only view the devices get)
+				sq_objective += _fast.apply_diff(self.x, d, diff)	# ||d + diff||^2 = ||d||^2 + 2 d.diff + ||diff||^2
+				tr_improvement[k] = best_improvement
+				k += 1
 
 			# Update objective + fairness trackers
-			new_objective = np.linalg.norm(np.array(self.x)-np.array(self.p))	# update objective score 2-norm x-p
-			tr_objective = np.append(tr_objective,new_objective)
+			tr_objective[i] = sq_objective	# update objective score, squared 2-norm x-p
 
-			burdens = [device.burden for device in self.devices if device.type != "BL"] #Exclude BL as they are passive devices
-			new_gini = ProfileSteering.gini(np.array(burdens))	# update Gini coefficient
-			tr_gini = np.append(tr_gini,new_gini)
-			#print("Iteration", i, "-- Winning device is is ", best_device.type, best_device, " with score ",  lowest_score, " -- Improvement is ", best_device.candidate_improvement, " -- This device's burden is now ", best_device.burden, " -- Inequality is now ", new_gini)
+			new_gini = ProfileSteering.gini(self.burdens, self.gini_ranks)	# update Gini coefficient, BL are excluded as they are passive devices
+			tr_gini[i] = new_gini
+			n = i + 1
+			#print("Iteration", i, "-- Winning device is is ", best_device.type, best_device, " -- Improvement is ", best_device.candidate_improvement, " -- This device's burden is now ", best_device.burden, " -- Inequality is now ", new_gini)
 
 			# Now check if the improvement is good enough
 			if best_improvement < e_min:
 				break # Break the loop
+			
+			# Or if the improvements have flattened out
+			avg_improvement = best_improvement if avg_improvement is None else 0.9*avg_improvement + 0.1*best_improvement
+			if avg_improvement < min_avg_improvement:
+				break
 				
-				
+		if pool is not None:
+			pool.shutdown()
 			
-		return self.x, tr_improvement, tr_objective, tr_gini # Return the profile, improvements, objective and gini over each iteration
\ No newline at end of file
+		# Turn the squared objectives into the 2-norm, clipped as rounding may push a square just below 0
+		tr_objective = np.sqrt(np.maximum(tr_objective[:n], 0.0))
+		
+		# self.x is reused by the next rerun, so the caller gets a copy of the profile
+		return self.x.copy(), tr_improvement[:k], tr_objective, tr_gini[:n] # Return the profile, improvements, objective and gini over each iteration
\ No newline at end of file